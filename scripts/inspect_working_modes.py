@@ -2,33 +2,49 @@
 """Summarize working mode usage from an existing recipe workbook."""
 from __future__ import annotations
 
+import sys
 import zipfile
 from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional
 from xml.etree import ElementTree as ET
 
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from scripts.schema_snapshot import iter_elements, open_xlsx, read_xml
+from src.utils.fast_json import dump_indented
+
 NS_MAIN = {"main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
 NS_REL = {"rel": "http://schemas.openxmlformats.org/package/2006/relationships"}
 
+_DIGIT_STRIP = str.maketrans("", "", "0123456789")
+
+ROW_TAG = f"{{{NS_MAIN['main']}}}row"
+CELL_TAG = f"{{{NS_MAIN['main']}}}c"
+SI_TAG = f"{{{NS_MAIN['main']}}}si"
+T_TAG = f"{{{NS_MAIN['main']}}}t"
+V_TAG = f"{{{NS_MAIN['main']}}}v"
+
 
 def load_shared_strings(z: zipfile.ZipFile) -> List[str]:
     if "xl/sharedStrings.xml" not in z.namelist():
         return []
-    root = ET.fromstring(z.read("xl/sharedStrings.xml"))
     strings = []
-    for si in root.findall("main:si", NS_MAIN):
-        text = "".join(t.text or "" for t in si.findall(".//main:t", NS_MAIN))
-        strings.append(text)
+    for si in iter_elements(z, "xl/sharedStrings.xml", SI_TAG):
+        strings.append("".join(t.text or "" for t in si.iter(T_TAG)))
     return strings
 
 
 def cell_value(cell: ET.Element, shared: List[str]) -> Optional[str]:
-    value = cell.find("main:v", NS_MAIN)
-    if value is None:
+    # <v> is nearly always the only child, so a direct scan beats a path lookup.
+    for child in cell:
+        if child.tag == V_TAG:
+            raw = child.text or ""
+            break
+    else:
         return None
-    raw = value.text or ""
-    if cell.attrib.get("t") == "s":
+    if cell.get("t") == "s":
         try:
             return shared[int(raw)]
         except (ValueError, IndexError):
@@ -37,8 +53,8 @@ def cell_value(cell: ET.Element, shared: List[str]) -> Optional[str]:
 
 
 def get_sheet_path(z: zipfile.ZipFile, sheet_name: str) -> str:
-    workbook = ET.fromstring(z.read("xl/workbook.xml"))
-    rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    workbook = read_xml(z, "xl/workbook.xml")
+    rels = read_xml(z, "xl/_rels/workbook.xml.rels")
     rel_map = {
         rel.attrib["Id"]: rel.attrib["Target"]
         for rel in rels.findall("rel:Relationship", NS_REL)
@@ -54,24 +70,25 @@ def get_sheet_path(z: zipfile.ZipFile, sheet_name: str) -> str:
     raise ValueError(f"Sheet {sheet_name} not found")
 
 
-def get_header_map(sheet: ET.Element, shared: List[str]) -> Dict[str, str]:
-    row = sheet.find(".//main:row[@r='1']", NS_MAIN)
-    if row is None:
+def get_header_map(row: Optional[ET.Element], shared: List[str]) -> Dict[str, str]:
+    if row is None or row.attrib.get("r") != "1":
         return {}
     headers = {}
-    for cell in row.findall("main:c", NS_MAIN):
+    for cell in row:
+        if cell.tag != CELL_TAG:
+            continue
         ref = cell.attrib.get("r", "")
-        col = "".join(ch for ch in ref if ch.isalpha())
+        col = ref.translate(_DIGIT_STRIP)
         headers[col] = cell_value(cell, shared) or ""
     return headers
 
 
 def inspect_working_modes(xlsx_path: Path) -> Dict[str, Dict[str, int]]:
-    with zipfile.ZipFile(xlsx_path) as z:
+    with open_xlsx(xlsx_path) as z:
         shared = load_shared_strings(z)
         sheet_path = get_sheet_path(z, "食谱步骤Cooking Steps")
-        root = ET.fromstring(z.read(sheet_path))
-        header_map = get_header_map(root, shared)
+        rows = iter_elements(z, sheet_path, ROW_TAG)
+        header_map = get_header_map(next(rows, None), shared)
         header_to_col = {v: k for k, v in header_map.items()}
         wm_col = header_to_col.get("*步骤/工作模式\nWorking Mode")
         desc_col = header_to_col.get("步骤/文字描述\nDescription")
@@ -80,30 +97,42 @@ def inspect_working_modes(xlsx_path: Path) -> Dict[str, Dict[str, int]]:
         rot_speed_col = header_to_col.get("步骤/旋转速度\nRotation Speed\n（0-12）")
         mins_col = header_to_col.get("步骤/分\nWorking Time/Mins")
         secs_col = header_to_col.get("步骤/秒\nWorking Time/ Seconds")
+        # Each wanted column feeds one slot: 0 = working mode, 1 = description,
+        # 2 = any machine control (only its truthiness matters).
+        slots = {
+            col: 2
+            for col in [temp_col, rot_dir_col, rot_speed_col, mins_col, secs_col]
+            if col
+        }
+        if desc_col:
+            slots[desc_col] = 1
+        if wm_col:
+            slots[wm_col] = 0
 
         counts = defaultdict(int)
         with_desc = defaultdict(int)
         with_controls = defaultdict(int)
 
-        for row in root.findall("main:sheetData/main:row", NS_MAIN):
+        for row in rows:
             if row.attrib.get("r") == "1":
                 continue
-            cells = {}
-            for cell in row.findall("main:c", NS_MAIN):
-                ref = cell.attrib.get("r", "")
-                col = "".join(ch for ch in ref if ch.isalpha())
-                cells[col] = cell_value(cell, shared)
-            mode = cells.get(wm_col)
+            values = [None, None, None]
+            for cell in row:
+                if cell.tag != CELL_TAG:
+                    continue
+                slot = slots.get(cell.attrib.get("r", "").translate(_DIGIT_STRIP))
+                if slot is None:
+                    continue
+                value = cell_value(cell, shared)
+                if value:
+                    values[slot] = value
+            mode, description, controls = values
             if not mode:
                 continue
             counts[mode] += 1
-            if desc_col and cells.get(desc_col):
+            if description:
                 with_desc[mode] += 1
-            if any(
-                cells.get(col)
-                for col in [temp_col, rot_dir_col, rot_speed_col, mins_col, secs_col]
-                if col
-            ):
+            if controls:
                 with_controls[mode] += 1
 
     return {
@@ -115,7 +144,6 @@ def inspect_working_modes(xlsx_path: Path) -> Dict[str, Dict[str, int]]:
 
 def main() -> None:
     import argparse
-    import json
 
     parser = argparse.ArgumentParser(
         description="Inspect working mode usage in an existing recipes workbook."
@@ -131,9 +159,7 @@ def main() -> None:
     args = parser.parse_args()
 
     summary = inspect_working_modes(args.xlsx)
-    args.output.write_text(
-        json.dumps(summary, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    dump_indented(summary, args.output)
     print(f"Wrote {args.output}")
 
 
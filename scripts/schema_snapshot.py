@@ -5,16 +5,43 @@ This uses only the Python standard library to avoid external dependencies.
 """
 from __future__ import annotations
 
+import contextlib
+import functools
+import hashlib
 import json
+import mmap
+import sys
+import tempfile
 import zipfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from xml.etree import ElementTree as ET
 
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+
+from src.utils.fast_json import dump_indented
+
 NS_MAIN = {"main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
 NS_REL = {"rel": "http://schemas.openxmlformats.org/package/2006/relationships"}
 
+_DIGIT_STRIP = str.maketrans("", "", "0123456789")
+
+ROW_TAG = f"{{{NS_MAIN['main']}}}row"
+CELL_TAG = f"{{{NS_MAIN['main']}}}c"
+SI_TAG = f"{{{NS_MAIN['main']}}}si"
+T_TAG = f"{{{NS_MAIN['main']}}}t"
+V_TAG = f"{{{NS_MAIN['main']}}}v"
+
+LIST_SHEETS = {
+    "分类列表Category List",
+    "标签列表Label List",
+    "配件列表Accessories List",
+    "食材单位列表Unit For Ingredients",
+    "自动程序Working Mode List",
+}
+
 
 @dataclass
 class WorkbookSheet:
@@ -22,23 +49,60 @@ class WorkbookSheet:
     path: str
 
 
+def iter_elements(z: zipfile.ZipFile, path: str, tag: str) -> Iterator[ET.Element]:
+    """Stream ``tag`` elements out of a ZIP member, clearing each one once consumed.
+
+    Only ``end`` events are requested, so the parser queues one event per
+    element. A consumed element is emptied in place; only its bare shell stays
+    attached to the parent, so large sheets never materialize as a full tree.
+    """
+    with z.open(path) as stream:
+        for _, elem in ET.iterparse(stream, events=("end",)):
+            if elem.tag == tag:
+                yield elem
+                elem.clear()
+
+
+class _MappedFile(mmap.mmap):
+    # zipfile probes ``seekable()``, which mmap only grew in Python 3.13.
+    def seekable(self) -> bool:
+        return True
+
+
+@contextlib.contextmanager
+def open_xlsx(xlsx_path: Path) -> Iterator[zipfile.ZipFile]:
+    """Open a workbook archive over a read-only memory map of the file."""
+    with open(xlsx_path, "rb") as fh, _MappedFile(
+        fh.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        with zipfile.ZipFile(mm) as z:
+            yield z
+
+
+def read_xml(z: zipfile.ZipFile, name: str) -> ET.Element:
+    """Parse a small, fully-loaded package part such as the workbook or its rels."""
+    with z.open(name) as stream:
+        return ET.parse(stream).getroot()
+
+
 def load_shared_strings(z: zipfile.ZipFile) -> List[str]:
     if "xl/sharedStrings.xml" not in z.namelist():
         return []
-    root = ET.fromstring(z.read("xl/sharedStrings.xml"))
     strings = []
-    for si in root.findall("main:si", NS_MAIN):
-        text = "".join(t.text or "" for t in si.findall(".//main:t", NS_MAIN))
-        strings.append(text)
+    for si in iter_elements(z, "xl/sharedStrings.xml", SI_TAG):
+        strings.append("".join(t.text or "" for t in si.iter(T_TAG)))
     return strings
 
 
 def cell_value(cell: ET.Element, shared: List[str]) -> Optional[str]:
-    value = cell.find("main:v", NS_MAIN)
-    if value is None:
+    # <v> is nearly always the only child, so a direct scan beats a path lookup.
+    for child in cell:
+        if child.tag == V_TAG:
+            raw = child.text or ""
+            break
+    else:
         return None
-    raw = value.text or ""
-    if cell.attrib.get("t") == "s":
+    if cell.get("t") == "s":
         try:
             return shared[int(raw)]
         except (ValueError, IndexError):
@@ -47,8 +111,8 @@ def cell_value(cell: ET.Element, shared: List[str]) -> Optional[str]:
 
 
 def get_sheet_paths(z: zipfile.ZipFile) -> List[WorkbookSheet]:
-    workbook = ET.fromstring(z.read("xl/workbook.xml"))
-    rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    workbook = read_xml(z, "xl/workbook.xml")
+    rels = read_xml(z, "xl/_rels/workbook.xml.rels")
     rel_map = {
         rel.attrib["Id"]: rel.attrib["Target"]
         for rel in rels.findall("rel:Relationship", NS_REL)
@@ -63,52 +127,53 @@ def get_sheet_paths(z: zipfile.ZipFile) -> List[WorkbookSheet]:
     return sheets
 
 
-def get_row(sheet: ET.Element, shared: List[str], row_num: int) -> Dict[str, Optional[str]]:
-    row = sheet.find(f".//main:row[@r='{row_num}']", NS_MAIN)
-    if row is None:
-        return {}
+def row_values(row: ET.Element, shared: List[str]) -> Dict[str, Optional[str]]:
     values = {}
-    for cell in row.findall("main:c", NS_MAIN):
+    for cell in row:
+        if cell.tag != CELL_TAG:
+            continue
         ref = cell.attrib.get("r", "")
-        col = "".join(ch for ch in ref if ch.isalpha())
+        col = ref.translate(_DIGIT_STRIP)
         values[col] = cell_value(cell, shared)
     return values
 
 
-def col_sorted(values: Dict[str, Optional[str]]) -> List[Optional[str]]:
-    def col_index(col: str) -> int:
-        index = 0
-        for ch in col:
-            index = index * 26 + (ord(ch) - 64)
-        return index
-
-    return [values.get(col) for col in sorted(values, key=col_index)]
+@functools.lru_cache(maxsize=1024)
+def col_index(col: str) -> int:
+    index = 0
+    for ch in col:
+        index = index * 26 + (ord(ch) - 64)
+    return index
 
 
-def iter_rows(sheet: ET.Element) -> Iterable[ET.Element]:
-    yield from sheet.findall("main:sheetData/main:row", NS_MAIN)
+def col_sorted(values: Dict[str, Optional[str]]) -> List[Optional[str]]:
+    return [values[col] for col in sorted(values, key=col_index)]
 
 
 def is_empty_row(row: ET.Element, shared: List[str]) -> bool:
-    for cell in row.findall("main:c", NS_MAIN):
-        if cell_value(cell, shared):
+    # Shared-string cells must still be resolved: templates keep placeholder
+    # rows whose cells point at empty shared strings.
+    for cell in row:
+        if cell.tag == CELL_TAG and cell_value(cell, shared):
             return False
     return True
 
 
 def read_list_sheet(
-    sheet: ET.Element, shared: List[str], header_map: Dict[str, str]
+    sheet_rows: Iterable[ET.Element], shared: List[str], header_map: Dict[str, str]
 ) -> List[Dict[str, Optional[str]]]:
     rows = []
-    for row in iter_rows(sheet):
+    for row in sheet_rows:
         if row.attrib.get("r") == "1":
             continue
         if is_empty_row(row, shared):
             continue
         entry = {}
-        for cell in row.findall("main:c", NS_MAIN):
+        for cell in row:
+            if cell.tag != CELL_TAG:
+                continue
             ref = cell.attrib.get("r", "")
-            col = "".join(ch for ch in ref if ch.isalpha())
+            col = ref.translate(_DIGIT_STRIP)
             header = header_map.get(col)
             if header:
                 entry[header] = cell_value(cell, shared)
@@ -118,7 +183,7 @@ def read_list_sheet(
 
 
 def snapshot_template(xlsx_path: Path) -> dict:
-    with zipfile.ZipFile(xlsx_path) as z:
+    with open_xlsx(xlsx_path) as z:
         shared = load_shared_strings(z)
         sheets = get_sheet_paths(z)
         output = {
@@ -127,26 +192,69 @@ def snapshot_template(xlsx_path: Path) -> dict:
         }
 
         for sheet in sheets:
-            root = ET.fromstring(z.read(sheet.path))
-            header_row = get_row(root, shared, 1)
-            headers = col_sorted(header_row)
+            rows = iter_elements(z, sheet.path, ROW_TAG)
+            header_row: Dict[str, Optional[str]] = {}
+            # Rows are stored in order, so the header is always the first one.
+            first = next(rows, None)
+            if first is not None and first.attrib.get("r") == "1":
+                header_row = row_values(first, shared)
             output["sheets"][sheet.name] = {
-                "headers": headers,
+                "headers": col_sorted(header_row),
             }
 
-            if sheet.name in {
-                "分类列表Category List",
-                "标签列表Label List",
-                "配件列表Accessories List",
-                "食材单位列表Unit For Ingredients",
-                "自动程序Working Mode List",
-            }:
+            if sheet.name in LIST_SHEETS:
                 output["sheets"][sheet.name]["rows"] = read_list_sheet(
-                    root, shared, header_row
+                    rows, shared, header_row
                 )
+            rows.close()
         return output
 
 
+def snapshot_template_cached(xlsx_path: Path, cache_dir: Optional[Path] = None) -> dict:
+    """Return ``snapshot_template(xlsx_path)``, reusing a prior result for an unchanged file.
+
+    Results are stored as JSON in ``cache_dir`` (the system temp dir by default),
+    one file per workbook path. Each entry records the workbook's mtime and size
+    and a digest of this script; any mismatch is a miss and the entry is
+    overwritten, so edits to the template or the extraction code never leave
+    stale files behind.
+    """
+    xlsx_path = xlsx_path.resolve()
+    stat = xlsx_path.stat()
+    stamp = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "source": hashlib.sha1(Path(__file__).read_bytes()).hexdigest(),
+    }
+    key = hashlib.sha1(str(xlsx_path).encode("utf-8")).hexdigest()
+    cache_dir = cache_dir or Path(tempfile.gettempdir())
+    cache_path = cache_dir / f"schema_snapshot_{key}.json"
+    try:
+        with cache_path.open(encoding="utf-8") as fh:
+            entry = json.load(fh)
+        if isinstance(entry, dict) and entry.get("stamp") == stamp:
+            return entry["snapshot"]
+    except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError, KeyError):
+        # A missing, truncated or corrupt entry is a miss; it is rewritten below.
+        pass
+
+    snapshot = snapshot_template(xlsx_path)
+    # A private temp file per writer keeps concurrent runs from clobbering
+    # each other; the rename into place is atomic.
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=cache_dir, suffix=".tmp", delete=False
+    ) as fh:
+        tmp_path = Path(fh.name)
+        try:
+            json.dump({"stamp": stamp, "snapshot": snapshot}, fh, ensure_ascii=False)
+        except BaseException:
+            fh.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+    tmp_path.replace(cache_path)
+    return snapshot
+
+
 def main() -> None:
     import argparse
 
@@ -162,9 +270,7 @@ def main() -> None:
     args = parser.parse_args()
 
     snapshot = snapshot_template(args.xlsx)
-    args.output.write_text(
-        json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    dump_indented(snapshot, args.output)
     print(f"Wrote {args.output}")
 
 
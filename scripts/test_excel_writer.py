@@ -2,9 +2,10 @@
 """Smoke test for Excel writer using the provider template."""
 from __future__ import annotations
 
+import types
 import zipfile
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Set
 from xml.etree import ElementTree as ET
 
 import sys
@@ -12,17 +13,41 @@ import sys
 repo_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(repo_root))
 
-from src.generators.excel_writer import write_recipes_to_template
+from src.generators import excel_writer
+from src.generators.excel_writer import (
+    INGREDIENT_HEADERS,
+    RECIPE_LIST_HEADERS,
+    STEP_HEADERS,
+    ingredient_cells,
+    recipe_list_cells,
+    step_cells,
+    write_recipes_to_template,
+)
 from src.utils.recipe_schema import Ingredient, Recipe, RecipeMeta, Step
 from src.validators.rule_validator import MODE_ADAPTED, MODE_DESCRIPTION
 
 NS_MAIN = {"main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
 NS_REL = {"rel": "http://schemas.openxmlformats.org/package/2006/relationships"}
 
+ROW_TAG = f"{{{NS_MAIN['main']}}}row"
+CELL_TAG = f"{{{NS_MAIN['main']}}}c"
+V_TAG = f"{{{NS_MAIN['main']}}}v"
+IS_TAG = f"{{{NS_MAIN['main']}}}is"
+T_TAG = f"{{{NS_MAIN['main']}}}t"
+SI_TAG = f"{{{NS_MAIN['main']}}}si"
+INLINE_T_PATH = f"{IS_TAG}/{T_TAG}"
+
+_DIGIT_STRIP = str.maketrans("", "", "0123456789")
+
+
+def parse_member(z: zipfile.ZipFile, name: str) -> ET.Element:
+    with z.open(name) as stream:
+        return ET.parse(stream).getroot()
+
 
 def get_sheet_paths(z: zipfile.ZipFile) -> Dict[str, str]:
-    workbook = ET.fromstring(z.read("xl/workbook.xml"))
-    rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+    workbook = parse_member(z, "xl/workbook.xml")
+    rels = parse_member(z, "xl/_rels/workbook.xml.rels")
     rel_map = {
         rel.attrib["Id"]: rel.attrib["Target"]
         for rel in rels.findall("rel:Relationship", NS_REL)
@@ -36,58 +61,105 @@ def get_sheet_paths(z: zipfile.ZipFile) -> Dict[str, str]:
 def load_shared_strings(z: zipfile.ZipFile) -> Dict[int, str]:
     if "xl/sharedStrings.xml" not in z.namelist():
         return {}
-    root = ET.fromstring(z.read("xl/sharedStrings.xml"))
+    root = parse_member(z, "xl/sharedStrings.xml")
     strings = {}
-    for idx, si in enumerate(root.findall("main:si", NS_MAIN)):
-        text = "".join(t.text or "" for t in si.findall(".//main:t", NS_MAIN))
+    for idx, si in enumerate(root.iter(SI_TAG)):
+        text = "".join(t.text or "" for t in si.iter(T_TAG))
         strings[idx] = text
     return strings
 
 
 def cell_value(cell: ET.Element, shared: Dict[int, str]) -> Optional[str]:
     if cell.attrib.get("t") == "s":
-        value = cell.find("main:v", NS_MAIN)
+        value = cell.find(V_TAG)
         if value is None or value.text is None:
             return None
         try:
             return shared[int(value.text)]
         except (ValueError, KeyError):
             return None
-    inline = cell.find("main:is/main:t", NS_MAIN)
+    inline = cell.find(INLINE_T_PATH)
     if inline is not None and inline.text is not None:
         return inline.text
-    value = cell.find("main:v", NS_MAIN)
+    value = cell.find(V_TAG)
     return value.text if value is not None else None
 
 
-def header_map(sheet: ET.Element, shared: Dict[int, str]) -> Dict[str, str]:
-    headers: Dict[str, str] = {}
-    row = sheet.find("main:sheetData/main:row[@r='1']", NS_MAIN)
-    if row is None:
-        return headers
-    for cell in row.findall("main:c", NS_MAIN):
-        ref = cell.attrib.get("r", "")
-        col = "".join(ch for ch in ref if ch.isalpha())
-        value = cell_value(cell, shared)
-        if value:
-            headers[value] = col
-    return headers
-
-
-def read_cell(
-    sheet: ET.Element, shared: Dict[int, str], header: str, row_num: int
-) -> Optional[str]:
-    headers = header_map(sheet, shared)
-    col = headers.get(header)
-    if not col:
-        return None
-    cell = sheet.find(
-        f"main:sheetData/main:row[@r='{row_num}']/main:c[@r='{col}{row_num}']",
-        NS_MAIN,
-    )
-    if cell is None:
-        return None
-    return cell_value(cell, shared)
+class SheetIndex:
+    """Header and cell lookups for one sheet, built in a single pass."""
+
+    def __init__(self, sheet: ET.Element, shared: Dict[int, str]) -> None:
+        self.shared = shared
+        self.headers: Dict[str, str] = {}
+        self.by_ref: Dict[str, ET.Element] = {}
+        for row in sheet.iter(ROW_TAG):
+            is_header = row.attrib.get("r") == "1"
+            for cell in row:
+                if cell.tag != CELL_TAG:
+                    continue
+                ref = cell.attrib.get("r", "")
+                self.by_ref[ref] = cell
+                if is_header:
+                    value = cell_value(cell, shared)
+                    if value:
+                        self.headers[value] = ref.translate(_DIGIT_STRIP)
+
+    def get(self, header: str, row_num: int) -> Optional[str]:
+        col = self.headers.get(header)
+        if not col:
+            return None
+        return self.get_by_col(col, row_num)
+
+    def get_by_col(self, col: str, row_num: int) -> Optional[str]:
+        cell = self.by_ref.get(f"{col}{row_num}")
+        if cell is None:
+            return None
+        return cell_value(cell, self.shared)
+
+
+def check_untouched_members(
+    output: Path, template: Path, generated: Set[str], raw: bool
+) -> None:
+    """Every member but the generated sheets must match the template.
+
+    With ``raw`` the compressed payload must be the template's own (same
+    method, size and CRC), which only the raw-copy path guarantees.
+    """
+    with zipfile.ZipFile(output) as z, zipfile.ZipFile(template) as tz:
+        assert z.testzip() is None, "Output archive has a corrupt member"
+        assert z.namelist() == tz.namelist(), "Output members differ from template"
+        for info in tz.infolist():
+            if info.filename in generated:
+                continue
+            assert z.read(info.filename) == tz.read(info.filename), (
+                f"Untouched member {info.filename} changed"
+            )
+            if raw:
+                out_info = z.getinfo(info.filename)
+                assert (out_info.compress_type, out_info.compress_size, out_info.CRC) == (
+                    info.compress_type,
+                    info.compress_size,
+                    info.CRC,
+                ), f"Untouched member {info.filename} was recompressed"
+
+
+def check_stream_fallback(recipe: Recipe, template: Path, output: Path, generated: Set[str]) -> None:
+    # Hide one zipfile internal from the writer only; the real module must
+    # stay intact because zipfile.open itself uses it.
+    real_zipfile = excel_writer.zipfile
+    visible = {
+        name: getattr(real_zipfile, name)
+        for name in dir(real_zipfile)
+        if name != "_FH_FILENAME_LENGTH"
+    }
+    excel_writer.zipfile = types.SimpleNamespace(**visible)
+    try:
+        write_recipes_to_template([recipe], template, output)
+        assert not excel_writer._RAW_COPY_ENABLED, "Raw copy should be disabled after a miss"
+    finally:
+        excel_writer.zipfile = real_zipfile
+        excel_writer._RAW_COPY_ENABLED = excel_writer._raw_copy_supported()
+    check_untouched_members(output, template, generated, raw=False)
 
 
 def main() -> None:
@@ -112,25 +184,45 @@ def main() -> None:
         ],
     )
 
+    # rows_xml zips each sheet's header order against its cell generator.
+    for headers, cells in [
+        (RECIPE_LIST_HEADERS, recipe_list_cells(recipe)),
+        (INGREDIENT_HEADERS, ingredient_cells(recipe, recipe.ingredients[0])),
+        (STEP_HEADERS, step_cells(recipe, recipe.steps[0])),
+    ]:
+        assert [key for key, _ in cells] == list(headers.values()), "Cell order differs from headers"
+    assert dict(recipe_list_cells(recipe, with_overview=False))["overview"] is None
+
     write_recipes_to_template([recipe], template, output)
 
     with zipfile.ZipFile(output) as z:
         shared = load_shared_strings(z)
         sheets = get_sheet_paths(z)
-        recipe_sheet = ET.fromstring(z.read(sheets["食谱列表Recipe List"]))
-        ingredient_sheet = ET.fromstring(z.read(sheets["食材Ingredients List"]))
-        steps_sheet = ET.fromstring(z.read(sheets["食谱步骤Cooking Steps"]))
+        generated = {
+            sheets[name]
+            for name in ["食谱列表Recipe List", "食材Ingredients List", "食谱步骤Cooking Steps"]
+        }
+        recipe_sheet, ingredient_sheet, steps_sheet = (
+            SheetIndex(parse_member(z, sheets[name]), shared)
+            for name in ["食谱列表Recipe List", "食材Ingredients List", "食谱步骤Cooking Steps"]
+        )
 
         assert (
-            read_cell(recipe_sheet, shared, "*食谱名称\nRecipe Name", 2) == "Receta de prueba"
+            recipe_sheet.get("*食谱名称\nRecipe Name", 2) == "Receta de prueba"
         ), "Recipe name missing"
-        assert (
-            read_cell(ingredient_sheet, shared, "*食材/单位\nIngredients/Unit", 2) == "g"
-        )
-        assert (
-            read_cell(steps_sheet, shared, "*步骤/工作模式\nWorking Mode", 3)
-            == MODE_ADAPTED
-        )
+        assert ingredient_sheet.get("*食材/单位\nIngredients/Unit", 2) == "g"
+        assert steps_sheet.get("*步骤/工作模式\nWorking Mode", 3) == MODE_ADAPTED
+
+        for name in generated:
+            for row in parse_member(z, name).iter(ROW_TAG):
+                cols = [cell.attrib["r"].translate(_DIGIT_STRIP) for cell in row]
+                assert cols == sorted(cols, key=lambda col: (len(col), col)), (
+                    f"Cells out of column order in {name} row {row.attrib.get('r')}"
+                )
+
+    assert excel_writer._RAW_COPY_ENABLED, "zipfile internals for raw copies are missing"
+    check_untouched_members(output, template, generated, raw=True)
+    check_stream_fallback(recipe, template, output, generated)
 
     output.unlink()
     print("Excel writer smoke test passed.")
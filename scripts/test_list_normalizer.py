@@ -2,13 +2,14 @@
 """Minimal test for list normalizer against template lookups."""
 from __future__ import annotations
 
-import subprocess
+import json
 import sys
 from pathlib import Path
 
 repo_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(repo_root))
 
+from scripts.schema_snapshot import snapshot_template_cached
 from src.transformers.list_normalizer import normalize_recipe
 from src.utils.lookups_loader import load_lookups
 from src.utils.recipe_schema import (
@@ -25,10 +26,8 @@ def main() -> None:
     snapshot_path = repo_root / "schema_snapshot.json"
     template_path = repo_root / "Excel template recetas.xlsx"
 
-    subprocess.run(
-        ["python", str(repo_root / "scripts/schema_snapshot.py"), str(template_path), "-o", str(snapshot_path)],
-        check=True,
-    )
+    snapshot = snapshot_template_cached(template_path)
+    snapshot_path.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
 
     lookups = load_lookups(snapshot_path)
 
@@ -2,7 +2,7 @@
 """Minimal smoke test for lookup loader against the current template."""
 from __future__ import annotations
 
-import subprocess
+import json
 from pathlib import Path
 
 import sys
@@ -10,6 +10,7 @@ import sys
 repo_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(repo_root))
 
+from scripts.schema_snapshot import snapshot_template_cached
 from src.utils.lookups_loader import load_lookups
 
 
@@ -18,15 +19,14 @@ def main() -> None:
     snapshot_path = repo_root / "schema_snapshot.json"
     template_path = repo_root / "Excel template recetas.xlsx"
 
-    subprocess.run(
-        ["python", str(repo_root / "scripts/schema_snapshot.py"), str(template_path), "-o", str(snapshot_path)],
-        check=True,
-    )
+    snapshot = snapshot_template_cached(template_path)
+    snapshot_path.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
 
     lookups = load_lookups(snapshot_path)
     assert lookups.units, "Expected units to be populated"
     assert lookups.accessories, "Expected accessories to be populated"
     assert lookups.working_modes, "Expected working modes to be populated"
+    assert lookups.units_set == frozenset(lookups.units), "Expected units_set to mirror units"
 
     snapshot_path.unlink(missing_ok=True)
 
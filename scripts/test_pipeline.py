@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+from dataclasses import asdict
 from pathlib import Path
 
 import sys
@@ -10,8 +11,9 @@ import sys
 repo_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(repo_root))
 
-from scripts.schema_snapshot import snapshot_template
-from src.pipeline.run_pipeline import run_pipeline
+from scripts.schema_snapshot import snapshot_template_cached
+from src.pipeline.run_pipeline import load_recipes_from_json, run_pipeline
+from src.utils.fast_json import dump_indented
 from src.utils.recipe_schema import Ingredient, Recipe, RecipeMeta, Step
 from src.validators.rule_validator import MODE_ADAPTED, MODE_DESCRIPTION
 
@@ -22,10 +24,8 @@ def main() -> None:
     output_path = repo_root / "tmp_pipeline_output.xlsx"
     input_path = repo_root / "tmp_pipeline_input.json"
 
-    snapshot = snapshot_template(template)
-    snapshot_path.write_text(
-        json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    snapshot = snapshot_template_cached(template)
+    dump_indented(snapshot, snapshot_path)
 
     recipe = Recipe(
         meta=RecipeMeta(
@@ -44,16 +44,9 @@ def main() -> None:
         ],
     )
 
-    payload = {
-        "recipes": [
-            {
-                "meta": recipe.meta.__dict__,
-                "ingredients": [ing.__dict__ for ing in recipe.ingredients],
-                "steps": [step.__dict__ for step in recipe.steps],
-            }
-        ]
-    }
+    payload = {"recipes": [asdict(recipe)]}
     input_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    assert load_recipes_from_json(input_path) == [recipe], "Round-tripped recipes differ"
 
     run_pipeline([recipe], snapshot_path, template, output_path)
 
@@ -15,6 +15,7 @@ from src.utils.recipe_schema import (
     Recipe,
     RecipeMeta,
     Step,
+    iter_schema_errors,
     validate_recipe,
 )
 
@@ -53,6 +54,7 @@ def main() -> None:
 
     bad_errors = validate_recipe(bad_recipe)
     assert bad_errors, "Expected validation errors for invalid recipe"
+    assert next(iter_schema_errors(bad_recipe)) == bad_errors[0], "Expected lazy errors to match"
 
 
 if __name__ == "__main__":
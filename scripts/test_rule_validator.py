@@ -13,6 +13,7 @@ from src.validators.rule_validator import (
     MODE_ADAPTED,
     MODE_DESCRIPTION,
     MODE_WEIGH,
+    VALID_MODES,
     validate_steps,
 )
 
@@ -34,6 +35,9 @@ def main() -> None:
     invalid_errors = validate_steps(invalid_steps)
     assert invalid_errors, "Expected rule validation errors"
 
+    narrowed_errors = validate_steps(valid_steps, valid_modes=VALID_MODES - {MODE_WEIGH})
+    assert len(narrowed_errors) == 1, f"Expected only the weigh step to fail: {narrowed_errors}"
+
 
 if __name__ == "__main__":
     main()
@@ -10,12 +10,12 @@ import sys
 from dataclasses import dataclass
 from fractions import Fraction
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 repo_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(repo_root))
 
-from scripts.schema_snapshot import snapshot_template
+from scripts.schema_snapshot import snapshot_template_cached
 from src.transformers.list_normalizer import normalize_recipe
 from src.utils.lookups_loader import load_lookups
 from src.utils.recipe_schema import (
@@ -27,7 +27,12 @@ from src.utils.recipe_schema import (
     Step,
     validate_recipe,
 )
-from src.validators.rule_validator import MODE_ADAPTED, MODE_DESCRIPTION, validate_steps
+from src.validators.rule_validator import (
+    MODE_ADAPTED,
+    MODE_DESCRIPTION,
+    VALID_MODES,
+    validate_steps,
+)
 
 
 @dataclass(frozen=True)
@@ -45,14 +50,31 @@ UNIT_MAP = {
 }
 
 
+JSON_LD_RE = re.compile(
+    r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>',
+    flags=re.DOTALL | re.IGNORECASE,
+)
+SERVINGS_RE = re.compile(r"\d+")
+INGREDIENT_RE = re.compile(r"^([\d½/.]+)\s+([^\s]+)?\s*(.+)$")
+TAG_RE = re.compile(r"<[^>]+>")
+NOBR_RE = re.compile(r"<nobr>(.*?)</nobr>")
+# One alternative per control; ``lastgroup`` tells which one matched. Each
+# alternative is a lookahead so no match consumes digits another control
+# needs (e.g. "vel 10 min" is both speed 10 and 10 minutes); the first match
+# of each group is then the same leftmost hit a separate search would find.
+CONTROL_RE = re.compile(
+    r"(?=(?P<minutes>\d+)\s*min)"
+    r"|(?=(?P<seconds>\d+)\s*seg)"
+    r"|(?=(?P<temperature>\d+)\s*°C)"
+    r"|(?=vel\s*(?P<speed>\d+))"
+)
+
+
 def extract_json_ld(html_text: str) -> dict:
-    candidates = re.findall(
-        r'<script[^>]*type="application/ld\+json"[^>]*>(.*?)</script>',
-        html_text,
-        flags=re.DOTALL | re.IGNORECASE,
-    )
-    for candidate in candidates:
-        raw = html.unescape(candidate.strip())
+    # Scan lazily: pages carry several JSON-LD blocks and the Recipe one is
+    # usually first, so later blocks never need to be sliced out or unescaped.
+    for match in JSON_LD_RE.finditer(html_text):
+        raw = html.unescape(match.group(1).strip())
         try:
             data = json.loads(raw)
         except json.JSONDecodeError:
@@ -63,7 +85,7 @@ def extract_json_ld(html_text: str) -> dict:
 
 
 def parse_servings(recipe_yield: str) -> int:
-    match = re.search(r"\d+", recipe_yield or "")
+    match = SERVINGS_RE.search(recipe_yield or "")
     if not match:
         raise ValueError("Unable to parse servings")
     return int(match.group(0))
@@ -76,9 +98,9 @@ def parse_quantity(value: str) -> float:
     return float(cleaned)
 
 
-def parse_ingredient(raw: str, lookups: Iterable[str]) -> Ingredient:
+def parse_ingredient(raw: str, lookups: FrozenSet[str], no: int = 0) -> Ingredient:
     cleaned = html.unescape(raw).strip()
-    match = re.match(r"^([\d½/.]+)\s+([^\s]+)?\s*(.+)$", cleaned)
+    match = INGREDIENT_RE.match(cleaned)
     if not match:
         raise ValueError(f"Unable to parse ingredient: {raw}")
     qty_raw, unit_raw, name = match.groups()
@@ -92,11 +114,11 @@ def parse_ingredient(raw: str, lookups: Iterable[str]) -> Ingredient:
     else:
         resolved_unit = "pcs"
         resolved_name = f"{unit} {name}".strip()
-    return Ingredient(no=0, qty=qty, unit=resolved_unit, name=resolved_name.strip())
+    return Ingredient(no=no, qty=qty, unit=resolved_unit, name=resolved_name.strip())
 
 
 def strip_tags(text: str) -> str:
-    return re.sub(r"<[^>]+>", "", text)
+    return TAG_RE.sub("", text)
 
 
 SPOON_SYMBOLS = {"\ue003"}
@@ -104,28 +126,19 @@ SPOON_SYMBOLS = {"\ue003"}
 
 def parse_controls(text: str) -> List[Tuple[Optional[int], Optional[int], Optional[int]]]:
     controls = []
-    for segment in re.findall(r"<nobr>(.*?)</nobr>", text):
+    for segment in NOBR_RE.findall(text):
         seg = html.unescape(segment)
-        minutes = None
-        seconds = None
-        temp = None
-        speed = None
-        min_match = re.search(r"(\d+)\s*min", seg)
-        sec_match = re.search(r"(\d+)\s*seg", seg)
-        temp_match = re.search(r"(\d+)\s*°C", seg)
-        speed_match = re.search(r"vel\s*(\d+)", seg)
-        has_spoon_symbol = any(symbol in seg for symbol in SPOON_SYMBOLS)
-        if min_match:
-            minutes = int(min_match.group(1))
-        if sec_match:
-            seconds = int(sec_match.group(1))
-        if temp_match:
-            temp = int(temp_match.group(1))
-        if speed_match:
-            speed = int(speed_match.group(1))
-        if has_spoon_symbol:
+        values: Dict[str, int] = {}
+        for match in CONTROL_RE.finditer(seg):
+            # Keep the first occurrence of each control.
+            if match.lastgroup not in values:
+                values[match.lastgroup] = int(match.group(match.lastgroup))
+        speed = values.get("speed")
+        if any(symbol in seg for symbol in SPOON_SYMBOLS):
             speed = 1
-        controls.append((minutes, seconds, temp, speed))
+        controls.append(
+            (values.get("minutes"), values.get("seconds"), values.get("temperature"), speed)
+        )
     return controls
 
 
@@ -182,7 +195,7 @@ def main() -> None:
     args = parser.parse_args()
 
     if not args.snapshot.exists():
-        snapshot = snapshot_template(args.template)
+        snapshot = snapshot_template_cached(args.template)
         args.snapshot.write_text(
             json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8"
         )
@@ -192,10 +205,11 @@ def main() -> None:
     data = extract_json_ld(html_text)
     parsed = parse_recipe(data)
 
-    ingredients = []
-    for idx, raw in enumerate(parsed.ingredients, start=1):
-        ingredient = parse_ingredient(raw, lookups.units)
-        ingredients.append(Ingredient(no=idx, qty=ingredient.qty, unit=ingredient.unit, name=ingredient.name))
+    unit_set = lookups.units_set
+    ingredients = [
+        parse_ingredient(raw, unit_set, no=idx)
+        for idx, raw in enumerate(parsed.ingredients, start=1)
+    ]
 
     steps = build_steps(parsed.instructions)
     recipe = Recipe(
@@ -218,7 +232,7 @@ def main() -> None:
     if normalization_errors:
         raise SystemExit(f"Normalization errors: {normalization_errors}")
 
-    rule_errors = validate_steps(steps)
+    rule_errors = validate_steps(steps, VALID_MODES & lookups.working_modes_set)
     if rule_errors:
         raise SystemExit(f"Rule errors: {rule_errors}")
 
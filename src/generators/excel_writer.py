@@ -1,18 +1,55 @@
 #!/usr/bin/env python3
-"""Write recipes into the provider Excel template using standard library only."""
+"""Write recipes into the provider Excel template.
+
+Only the standard library is required; lxml is used for XML parsing when it
+is installed.
+"""
 from __future__ import annotations
 
+import copy
+import functools
+import io
+import re
+import shutil
+import struct
 import zipfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
-from xml.etree import ElementTree as ET
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape as xml_escape
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    from xml.etree import ElementTree as ET
 
-from src.utils.recipe_schema import Recipe, Step
+from src.utils.recipe_schema import Ingredient, Recipe, Step
 
 NS_MAIN = {"main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
 NS_REL = {"rel": "http://schemas.openxmlformats.org/package/2006/relationships"}
 
+_DIGIT_STRIP = str.maketrans("", "", "0123456789")
+
+ROW_TAG = f"{{{NS_MAIN['main']}}}row"
+CELL_TAG = f"{{{NS_MAIN['main']}}}c"
+V_TAG = f"{{{NS_MAIN['main']}}}v"
+IS_TAG = f"{{{NS_MAIN['main']}}}is"
+SI_TAG = f"{{{NS_MAIN['main']}}}si"
+T_TAG = f"{{{NS_MAIN['main']}}}t"
+INLINE_T_PATH = f"{IS_TAG}/{T_TAG}"
+SHEET_PATH = f"{{{NS_MAIN['main']}}}sheets/{{{NS_MAIN['main']}}}sheet"
+RELATIONSHIP_TAG = f"{{{NS_REL['rel']}}}Relationship"
+REL_ID_ATTR = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+# Raw-XML landmarks used to splice generated rows into a template sheet. The
+# prefix group captures the main namespace prefix if the sheet uses one.
+_SHEET_DATA_OPEN_RE = re.compile(rb"<((?:[A-Za-z_][\w.-]*:)?)sheetData\b[^>]*?(/?)>")
+_HEADER_ROW_RE = re.compile(
+    rb'\s*<(?:[A-Za-z_][\w.-]*:)?row\b[^>]*?\br="1"[^>]*?'
+    rb"(?:/>|>.*?</(?:[A-Za-z_][\w.-]*:)?row>)",
+    re.DOTALL,
+)
+
 
 @dataclass(frozen=True)
 class WorkbookSheet:
@@ -20,6 +57,25 @@ class WorkbookSheet:
     path: str
 
 
+@dataclass(frozen=True)
+class SheetPlan:
+    """Template sheet pieces the writer needs, split around the data rows."""
+
+    path: str
+    header_to_col: Dict[str, str]
+    head: bytes
+    tail: bytes
+    prefix: str
+
+
+RECIPE_LIST_SHEET = "食谱列表Recipe List"
+INGREDIENTS_SHEET = "食材Ingredients List"
+STEPS_SHEET = "食谱步骤Cooking Steps"
+GENERATED_SHEETS = (RECIPE_LIST_SHEET, INGREDIENTS_SHEET, STEPS_SHEET)
+
+# Each header dict lists the sheet's columns in template order, and the
+# matching *_cells generator yields exactly one (key, value) pair per entry in
+# that same order; rows_xml zips the two together.
 RECIPE_LIST_HEADERS = {
     "*食谱序号\nRecipe NO": "recipe_no",
     "语言\nLanguage": "language",
@@ -77,20 +133,21 @@ DEFAULT_DIFFICULTY = "fácil"
 DEFAULT_ACCESSORY_NO = 5
 DEFAULT_ACCESSORY_NAME = "Cuchilla"
 
+# Deflate level for the generated sheets; 1 trades file size for speed.
+DEFAULT_COMPRESSLEVEL = 6
+
 
 def get_sheet_paths(z: zipfile.ZipFile) -> List[WorkbookSheet]:
     workbook = ET.fromstring(z.read("xl/workbook.xml"))
     rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
     rel_map = {
         rel.attrib["Id"]: rel.attrib["Target"]
-        for rel in rels.findall("rel:Relationship", NS_REL)
+        for rel in rels.iterfind(RELATIONSHIP_TAG)
     }
     sheets = []
-    for sheet in workbook.findall("main:sheets/main:sheet", NS_MAIN):
+    for sheet in workbook.iterfind(SHEET_PATH):
         name = sheet.attrib["name"]
-        rid = sheet.attrib[
-            "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
-        ]
+        rid = sheet.attrib[REL_ID_ATTR]
         sheets.append(WorkbookSheet(name=name, path=f"xl/{rel_map[rid]}"))
     return sheets
 
@@ -100,20 +157,28 @@ def load_shared_strings(z: zipfile.ZipFile) -> List[str]:
         return []
     root = ET.fromstring(z.read("xl/sharedStrings.xml"))
     strings = []
-    for si in root.findall("main:si", NS_MAIN):
-        text = "".join(t.text or "" for t in si.findall(".//main:t", NS_MAIN))
-        strings.append(text)
+    for si in root.iterfind(SI_TAG):
+        # Plain strings are a single <t>; only rich-text runs need joining.
+        if len(si) == 1 and si[0].tag == T_TAG:
+            strings.append(si[0].text or "")
+        else:
+            strings.append("".join(t.text or "" for t in si.iter(T_TAG)))
     return strings
 
 
-def header_map(sheet: ET.Element, shared: List[str]) -> Dict[str, str]:
+def header_uses_shared_strings(row: Optional[ET.Element]) -> bool:
+    if row is None:
+        return False
+    return any(cell.get("t") == "s" for cell in row)
+
+
+def header_map(row: Optional[ET.Element], shared: List[str]) -> Dict[str, str]:
     headers: Dict[str, str] = {}
-    row = sheet.find("main:sheetData/main:row[@r='1']", NS_MAIN)
     if row is None:
         return headers
-    for cell in row.findall("main:c", NS_MAIN):
+    for cell in row.iterfind(CELL_TAG):
         ref = cell.attrib.get("r", "")
-        col = "".join(ch for ch in ref if ch.isalpha())
+        col = ref.translate(_DIGIT_STRIP)
         value = cell_value(cell, shared)
         if value:
             headers[value] = col
@@ -122,212 +187,345 @@ def header_map(sheet: ET.Element, shared: List[str]) -> Dict[str, str]:
 
 def cell_value(cell: ET.Element, shared: List[str]) -> Optional[str]:
     if cell.attrib.get("t") == "s":
-        value = cell.find("main:v", NS_MAIN)
+        value = cell.find(V_TAG)
         if value is None or value.text is None:
             return None
         try:
             return shared[int(value.text)]
         except (ValueError, IndexError):
             return None
-    inline = cell.find("main:is/main:t", NS_MAIN)
+    inline = cell.find(INLINE_T_PATH)
     if inline is not None and inline.text is not None:
         return inline.text
-    value = cell.find("main:v", NS_MAIN)
+    value = cell.find(V_TAG)
     if value is None:
         return None
     return value.text
 
 
-def clear_data_rows(sheet: ET.Element) -> None:
-    sheet_data = sheet.find("main:sheetData", NS_MAIN)
-    if sheet_data is None:
-        return
-    for row in list(sheet_data.findall("main:row", NS_MAIN)):
-        if row.attrib.get("r") != "1":
-            sheet_data.remove(row)
+def read_header_row(sheet_xml: bytes) -> Optional[ET.Element]:
+    """Parse only as far as the first row and return it if it is the header (r=1)."""
+    for _, elem in ET.iterparse(io.BytesIO(sheet_xml), events=("end",)):
+        if elem.tag == ROW_TAG:
+            return elem if elem.attrib.get("r") == "1" else None
+    return None
+
+
+def split_sheet(sheet_xml: bytes) -> Tuple[bytes, bytes, str]:
+    """Split raw sheet XML around its data rows.
+
+    Returns the bytes up to and including the header row, the bytes from the
+    closing sheetData tag on, and the namespace prefix generated rows must use.
+    Everything outside sheetData is kept byte-for-byte.
+    """
+    match = _SHEET_DATA_OPEN_RE.search(sheet_xml)
+    if match is None:
+        raise ValueError("Template sheet has no sheetData element")
+    prefix = match.group(1)
+    if match.group(2):
+        head = sheet_xml[: match.start()] + b"<" + prefix + b"sheetData>"
+        tail = b"</" + prefix + b"sheetData>" + sheet_xml[match.end() :]
+        return head, tail, prefix.decode("ascii")
+    head_end = match.end()
+    header = _HEADER_ROW_RE.match(sheet_xml, head_end)
+    if header is not None:
+        head_end = header.end()
+    tail_start = sheet_xml.index(b"</" + prefix + b"sheetData>", head_end)
+    return sheet_xml[:head_end], sheet_xml[tail_start:], prefix.decode("ascii")
+
+
+def cell_xml(col: str, row_num: int, value: object, p: str = "") -> str:
+    if isinstance(value, (int, float)):
+        return f'<{p}c r="{col}{row_num}"><{p}v>{value}</{p}v></{p}c>'
+    return (
+        f'<{p}c r="{col}{row_num}" t="inlineStr"><{p}is><{p}t>'
+        f"{xml_escape(str(value))}</{p}t></{p}is></{p}c>"
+    )
 
 
-def make_cell(col: str, row_num: int, value: object) -> ET.Element:
-    cell = ET.Element(f"{{{NS_MAIN['main']}}}c", r=f"{col}{row_num}")
-    if value is None:
-        return cell
-    if isinstance(value, (int, float)):
-        v = ET.SubElement(cell, f"{{{NS_MAIN['main']}}}v")
-        v.text = str(value)
-        return cell
-    cell.set("t", "inlineStr")
-    is_el = ET.SubElement(cell, f"{{{NS_MAIN['main']}}}is")
-    t_el = ET.SubElement(is_el, f"{{{NS_MAIN['main']}}}t")
-    t_el.text = str(value)
-    return cell
-
-
-def append_rows(
-    sheet: ET.Element,
+def rows_xml(
     header_to_col: Dict[str, str],
-    rows: List[Dict[str, object]],
+    rows: Iterable[Iterable[Tuple[str, object]]],
     headers: Dict[str, str],
-) -> None:
-    sheet_data = sheet.find("main:sheetData", NS_MAIN)
-    if sheet_data is None:
-        sheet_data = ET.SubElement(sheet, f"{{{NS_MAIN['main']}}}sheetData")
+    prefix: str = "",
+) -> str:
+    # One template column (or None when unmapped) per header, in header order.
+    plan = [header_to_col.get(header) for header in headers]
+    parts: List[str] = []
     start_row = 2
-    for offset, row_data in enumerate(rows):
+    for offset, cells in enumerate(rows):
         row_num = start_row + offset
-        row = ET.Element(f"{{{NS_MAIN['main']}}}row", r=str(row_num))
-        for header, key in headers.items():
-            col = header_to_col.get(header)
-            if not col:
-                continue
-            value = row_data.get(key)
-            if value is None:
+        parts.append(f'<{prefix}row r="{row_num}">')
+        for col, (_, value) in zip(plan, cells):
+            if not col or value is None:
                 continue
-            row.append(make_cell(col, row_num, value))
-        sheet_data.append(row)
-
-
-def recipe_list_rows(recipes: List[Recipe]) -> List[Dict[str, object]]:
-    rows = []
-    for recipe in recipes:
-        rows.append(
-            {
-                "recipe_no": recipe.meta.recipe_no,
-                "language": recipe.meta.language,
-                "recipe_type": recipe.meta.recipe_type,
-                "name": recipe.meta.name,
-                "category": DEFAULT_CATEGORY,
-                "servings": recipe.meta.servings,
-                "prep_hours": DEFAULT_PREP_HOURS,
-                "prep_minutes": DEFAULT_PREP_MINUTES,
-                "cook_hours": DEFAULT_COOK_HOURS,
-                "cook_minutes": DEFAULT_COOK_MINUTES,
-                "rest_hours": DEFAULT_REST_HOURS,
-                "rest_minutes": DEFAULT_REST_MINUTES,
-                "difficulty": DEFAULT_DIFFICULTY,
-                "accessory_no": DEFAULT_ACCESSORY_NO,
-                "accessory_name": DEFAULT_ACCESSORY_NAME,
-                "overview": build_overview(recipe.steps),
-                "servings": recipe.meta.servings,
-            }
-        )
-    return rows
+            parts.append(cell_xml(col, row_num, value, prefix))
+        parts.append(f"</{prefix}row>")
+    return "".join(parts)
+
+
+def build_sheet_bytes(
+    plan: SheetPlan,
+    rows: Iterable[Iterable[Tuple[str, object]]],
+    headers: Dict[str, str],
+) -> bytes:
+    """Return the template sheet with its data rows replaced by ``rows``."""
+    data_rows = rows_xml(plan.header_to_col, rows, headers, plan.prefix).encode("utf-8")
+    return b"".join((plan.head, data_rows, plan.tail))
+
+
+@functools.lru_cache(maxsize=8)
+def _template_plan(path_str: str, mtime_ns: int, size: int) -> Dict[str, SheetPlan]:
+    # mtime_ns and size only key the cache so an edited template is re-read.
+    with zipfile.ZipFile(path_str) as z:
+        # The writer only emits inline strings; the shared-string table is
+        # loaded only if a template header row actually references it.
+        shared: Optional[List[str]] = None
+        sheet_map = {sheet.name: sheet.path for sheet in get_sheet_paths(z)}
+        plans: Dict[str, SheetPlan] = {}
+        for name in GENERATED_SHEETS:
+            path = sheet_map.get(name)
+            if not path:
+                raise ValueError(f"Missing sheet {name} in template")
+            sheet_xml = z.read(path)
+            header_row = read_header_row(sheet_xml)
+            if shared is None and header_uses_shared_strings(header_row):
+                shared = load_shared_strings(z)
+            head, tail, prefix = split_sheet(sheet_xml)
+            plans[name] = SheetPlan(path, header_map(header_row, shared or []), head, tail, prefix)
+    return plans
+
+
+def mapped_keys(header_to_col: Dict[str, str], headers: Dict[str, str]) -> FrozenSet[str]:
+    return frozenset(key for header, key in headers.items() if header_to_col.get(header))
+
+
+def recipe_list_rows(
+    recipes: List[Recipe], with_overview: bool = True
+) -> Iterator[Iterator[Tuple[str, object]]]:
+    return (recipe_list_cells(recipe, with_overview) for recipe in recipes)
+
+
+def recipe_list_cells(recipe: Recipe, with_overview: bool = True) -> Iterator[Tuple[str, object]]:
+    meta = recipe.meta
+    yield "recipe_no", meta.recipe_no
+    yield "language", meta.language
+    yield "recipe_type", meta.recipe_type
+    yield "name", meta.name
+    yield "category", DEFAULT_CATEGORY
+    yield "servings", meta.servings
+    yield "prep_hours", DEFAULT_PREP_HOURS
+    yield "prep_minutes", DEFAULT_PREP_MINUTES
+    yield "cook_hours", DEFAULT_COOK_HOURS
+    yield "cook_minutes", DEFAULT_COOK_MINUTES
+    yield "rest_hours", DEFAULT_REST_HOURS
+    yield "rest_minutes", DEFAULT_REST_MINUTES
+    yield "difficulty", DEFAULT_DIFFICULTY
+    yield "accessory_no", DEFAULT_ACCESSORY_NO
+    yield "accessory_name", DEFAULT_ACCESSORY_NAME
+    # The overview walks every step, so skip it when the template has no column for it.
+    yield "overview", build_overview(recipe.steps) if with_overview else None
 
 
 def build_overview(steps: List[Step]) -> str:
-    sentences: List[str] = [f"Ponemos en el vaso el accesorio \"{DEFAULT_ACCESSORY_NAME}\"."]
+    parts: List[str] = [f"Ponemos en el vaso el accesorio \"{DEFAULT_ACCESSORY_NAME}\"."]
     for step in steps:
-        if step.description and step.description.strip():
-            sentences.append(step.description.strip())
+        description = step.description.strip() if step.description else ""
+        if description:
+            parts += (" ", description)
             continue
-        if step.temperature is None and step.speed is None and step.minutes is None and step.seconds is None:
-            continue
-        parts: List[str] = []
+        mark = len(parts)
+        parts.append(" Cocinamos ")
         if step.minutes is not None:
-            parts.append(f"{step.minutes} minutos")
+            parts += (str(step.minutes), " minutos")
         if step.seconds is not None and step.seconds != 0:
-            parts.append(f"{step.seconds} segundos")
-        time_text = " ".join(parts)
-        temp_text = f"{step.temperature}°C" if step.temperature is not None else None
-        speed_text = f"velocidad {step.speed}" if step.speed is not None else None
-        details = ", ".join(item for item in [time_text, temp_text, speed_text] if item)
-        if details:
-            sentences.append(f"Cocinamos {details}.")
-    return " ".join(sentences)
-
-
-def ingredient_rows(recipes: List[Recipe]) -> List[Dict[str, object]]:
-    rows = []
-    for recipe in recipes:
-        for ingredient in recipe.ingredients:
-            rows.append(
-                {
-                    "recipe_no": recipe.meta.recipe_no,
-                    "language": recipe.meta.language,
-                    "recipe_type": recipe.meta.recipe_type,
-                    "name": recipe.meta.name,
-                    "ingredient_no": ingredient.no,
-                    "qty": ingredient.qty,
-                    "unit": ingredient.unit,
-                    "ingredient_name": ingredient.name,
-                }
-            )
-    return rows
-
-
-def step_rows(recipes: List[Recipe]) -> List[Dict[str, object]]:
-    rows = []
-    for recipe in recipes:
-        for step in recipe.steps:
-            rows.append(step_row(recipe, step))
-    return rows
-
-
-def step_row(recipe: Recipe, step: Step) -> Dict[str, object]:
-    mapped_speed = map_speed(step.speed)
-    return {
-        "recipe_no": recipe.meta.recipe_no,
-        "language": recipe.meta.language,
-        "recipe_type": recipe.meta.recipe_type,
-        "name": recipe.meta.name,
-        "step_no": step.no,
-        "mode": step.mode,
-        "description": step.description,
-        "temperature": step.temperature,
-        "direction": 0,
-        "speed": mapped_speed,
-        "direction": step.direction,
-        "speed": step.speed,
-        "minutes": step.minutes,
-        "seconds": step.seconds,
-    }
-
-
-def map_speed(speed: Optional[float | str]) -> Optional[int]:
-    if speed is None:
-        return None
-    if isinstance(speed, str):
-        normalized = speed.strip().lower()
-        if "cuchara" in normalized:
-            return 1
+            if step.minutes is not None:
+                parts.append(" ")
+            parts += (str(step.seconds), " segundos")
+        if step.temperature is not None:
+            if len(parts) > mark + 1:
+                parts.append(", ")
+            parts += (str(step.temperature), "°C")
+        if step.speed is not None:
+            if len(parts) > mark + 1:
+                parts.append(", ")
+            parts += ("velocidad ", str(step.speed))
+        if len(parts) > mark + 1:
+            parts.append(".")
+        else:
+            del parts[mark:]
+    return "".join(parts)
+
+
+def ingredient_rows(recipes: List[Recipe]) -> Iterator[Iterator[Tuple[str, object]]]:
+    return (
+        ingredient_cells(recipe, ingredient)
+        for recipe in recipes
+        for ingredient in recipe.ingredients
+    )
+
+
+def ingredient_cells(recipe: Recipe, ingredient: Ingredient) -> Iterator[Tuple[str, object]]:
+    meta = recipe.meta
+    yield "recipe_no", meta.recipe_no
+    yield "language", meta.language
+    yield "recipe_type", meta.recipe_type
+    yield "name", meta.name
+    yield "ingredient_no", ingredient.no
+    yield "qty", ingredient.qty
+    yield "unit", ingredient.unit
+    yield "ingredient_name", ingredient.name
+
+
+def step_rows(recipes: List[Recipe]) -> Iterator[Iterator[Tuple[str, object]]]:
+    return (step_cells(recipe, step) for recipe in recipes for step in recipe.steps)
+
+
+def step_cells(recipe: Recipe, step: Step) -> Iterator[Tuple[str, object]]:
+    meta = recipe.meta
+    yield "recipe_no", meta.recipe_no
+    yield "language", meta.language
+    yield "recipe_type", meta.recipe_type
+    yield "name", meta.name
+    yield "step_no", step.no
+    yield "mode", step.mode
+    yield "description", step.description
+    yield "temperature", step.temperature
+    yield "direction", step.direction
+    yield "speed", step.speed
+    yield "minutes", step.minutes
+    yield "seconds", step.seconds
+
+
+# zipfile internals used by _raw_copy. Checked against CPython 3.10, 3.11,
+# 3.12 and 3.13; the probe below disables raw copies if any of them is gone.
+_RAW_COPY_MODULE_NAMES = (
+    "sizeFileHeader",
+    "stringFileHeader",
+    "structFileHeader",
+    "_FH_FILENAME_LENGTH",
+    "_FH_EXTRA_FIELD_LENGTH",
+)
+_RAW_COPY_ARCHIVE_NAMES = (
+    "fp",
+    "filelist",
+    "NameToInfo",
+    "start_dir",
+    "_lock",
+    "_writing",
+    "_seekable",
+    "_writecheck",
+    "_didModify",
+)
+
+
+def _raw_copy_supported() -> bool:
+    if not all(hasattr(zipfile, name) for name in _RAW_COPY_MODULE_NAMES):
+        return False
+    with zipfile.ZipFile(io.BytesIO(), "w") as probe:
+        return all(hasattr(probe, name) for name in _RAW_COPY_ARCHIVE_NAMES)
+
+
+# Decided once at import; cleared for the rest of the process if a raw copy
+# still hits a missing internal, so later members go straight to streaming.
+_RAW_COPY_ENABLED = _raw_copy_supported()
+
+
+def _raw_copy(zin: zipfile.ZipFile, zout: zipfile.ZipFile, item: zipfile.ZipInfo) -> None:
+    """Copy a member's compressed payload verbatim, without inflating it.
+
+    Relies on zipfile's local-header layout helpers and writer bookkeeping
+    (see _RAW_COPY_ARCHIVE_NAMES). Everything is read and checked before the
+    first byte is written, so callers can fall back to a regular copy on
+    ``BadZipFile``/``ValueError``/``struct.error``/``AttributeError``.
+    """
+    if item.flag_bits & 0x1:
+        raise ValueError("Encrypted members cannot be copied raw")
+    with zin._lock:
+        zin.fp.seek(item.header_offset)
+        header = zin.fp.read(zipfile.sizeFileHeader)
+        if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local header for {item.filename}")
+        fields = struct.unpack(zipfile.structFileHeader, header)
+        zin.fp.seek(
+            fields[zipfile._FH_FILENAME_LENGTH] + fields[zipfile._FH_EXTRA_FIELD_LENGTH], 1
+        )
+        payload = zin.fp.read(item.compress_size)
+    if len(payload) != item.compress_size:
+        raise zipfile.BadZipFile(f"Truncated data for {item.filename}")
+
+    info = copy.copy(item)
+    # CRC and sizes are known up front, so they go in the local header and no
+    # trailing data descriptor is needed.
+    info.flag_bits &= ~0x08
+    with zout._lock:
+        if zout._writing or not zout._seekable:
+            raise ValueError("Output archive cannot take a raw member copy")
+        zout._writecheck(info)
+        zout._didModify = True
+        zout.fp.seek(zout.start_dir)
+        info.header_offset = zout.fp.tell()
+        zout.fp.write(info.FileHeader())
+        zout.fp.write(payload)
+        zout.start_dir = zout.fp.tell()
+        zout.filelist.append(info)
+        zout.NameToInfo[info.filename] = info
+
+
+def _copy_member(zin: zipfile.ZipFile, zout: zipfile.ZipFile, item: zipfile.ZipInfo) -> bool:
+    """Try a raw copy of ``item``; return False if the caller must stream it."""
+    global _RAW_COPY_ENABLED
+    if not _RAW_COPY_ENABLED:
+        return False
     try:
-        value = float(speed)
-    except (TypeError, ValueError):
-        return None
-    mapped = int(round(value * 12 / 10))
-    if mapped < 1:
-        return 1
-    if mapped > 12:
-        return 12
-    return mapped
+        _raw_copy(zin, zout, item)
+    except AttributeError:
+        _RAW_COPY_ENABLED = False
+        return False
+    except (zipfile.BadZipFile, ValueError, struct.error):
+        return False
+    return True
 
 
 def write_recipes_to_template(
-    recipes: List[Recipe], template_path: Path, output_path: Path
+    recipes: List[Recipe],
+    template_path: Path,
+    output_path: Path,
+    compresslevel: int = DEFAULT_COMPRESSLEVEL,
 ) -> None:
-    with zipfile.ZipFile(template_path) as z:
-        shared = load_shared_strings(z)
-        sheets = get_sheet_paths(z)
-        sheet_map = {sheet.name: sheet.path for sheet in sheets}
+    stat = template_path.stat()
+    plans = _template_plan(str(template_path.resolve()), stat.st_mtime_ns, stat.st_size)
+    recipe_keys = mapped_keys(plans[RECIPE_LIST_SHEET].header_to_col, RECIPE_LIST_HEADERS)
+    replacements: Dict[str, bytes] = {}
+    for plan, rows, headers in [
+        (
+            plans[RECIPE_LIST_SHEET],
+            recipe_list_rows(recipes, with_overview="overview" in recipe_keys),
+            RECIPE_LIST_HEADERS,
+        ),
+        (plans[INGREDIENTS_SHEET], ingredient_rows(recipes), INGREDIENT_HEADERS),
+        (plans[STEPS_SHEET], step_rows(recipes), STEP_HEADERS),
+    ]:
+        replacements[plan.path] = build_sheet_bytes(plan, rows, headers)
 
-        replacements: Dict[str, bytes] = {}
-
-        for name, headers, rows in [
-            ("食谱列表Recipe List", RECIPE_LIST_HEADERS, recipe_list_rows(recipes)),
-            ("食材Ingredients List", INGREDIENT_HEADERS, ingredient_rows(recipes)),
-            ("食谱步骤Cooking Steps", STEP_HEADERS, step_rows(recipes)),
-        ]:
-            path = sheet_map.get(name)
-            if not path:
-                raise ValueError(f"Missing sheet {name} in template")
-            root = ET.fromstring(z.read(path))
-            headers_to_col = header_map(root, shared)
-            clear_data_rows(root)
-            append_rows(root, headers_to_col, rows, headers)
-            replacements[path] = ET.tostring(root, encoding="utf-8", xml_declaration=True)
-
-        with zipfile.ZipFile(output_path, "w") as out:
+    with zipfile.ZipFile(template_path) as z:
+        with zipfile.ZipFile(
+            output_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+        ) as out:
             for item in z.infolist():
-                if item.filename in replacements:
-                    out.writestr(item, replacements[item.filename])
-                else:
-                    out.writestr(item, z.read(item.filename))
+                data = replacements.get(item.filename)
+                if data is not None:
+                    # Generated sheets are always deflated at the writer's level;
+                    # untouched parts keep the template's own compression.
+                    out.writestr(
+                        item,
+                        data,
+                        compress_type=zipfile.ZIP_DEFLATED,
+                        compresslevel=compresslevel,
+                    )
+                elif item.is_dir():
+                    out.writestr(item, b"")
+                elif not _copy_member(z, out, item):
+                    # Stream untouched parts instead of reading each into memory.
+                    with z.open(item) as src, out.open(item, "w") as dst:
+                        shutil.copyfileobj(src, dst)
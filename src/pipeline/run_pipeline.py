@@ -2,24 +2,28 @@
 """Orchestrate recipe validation and export to the provider template."""
 from __future__ import annotations
 
-import json
+from itertools import islice
 from pathlib import Path
 from typing import List
 
 from src.generators.excel_writer import write_recipes_to_template
 from src.transformers.list_normalizer import normalize_recipe
+from src.utils.fast_json import loads
 from src.utils.lookups_loader import load_lookups
-from src.utils.recipe_schema import Ingredient, Recipe, RecipeMeta, Step, validate_recipe
-from src.validators.rule_validator import validate_steps
+from src.utils.recipe_schema import Ingredient, Recipe, RecipeMeta, Step, iter_schema_errors
+from src.validators.rule_validator import iter_rule_errors
+
+# Upper bound on the errors collected for a failing recipe's exception message.
+MAX_REPORTED_ERRORS = 10
 
 
 def load_recipes_from_json(path: Path) -> List[Recipe]:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = loads(path.read_bytes())
     recipes = []
     for item in data.get("recipes", []):
-        meta = RecipeMeta(**item["meta"])
-        ingredients = [Ingredient(**ing) for ing in item.get("ingredients", [])]
-        steps = [Step(**step) for step in item.get("steps", [])]
+        meta = RecipeMeta.from_dict(item["meta"])
+        ingredients = [Ingredient.from_dict(ing) for ing in item.get("ingredients", [])]
+        steps = [Step.from_dict(step) for step in item.get("steps", [])]
         recipes.append(Recipe(meta=meta, ingredients=ingredients, steps=steps))
     return recipes
 
@@ -30,7 +34,7 @@ def run_pipeline(
     lookups = load_lookups(snapshot_path)
 
     for recipe in recipes:
-        schema_errors = validate_recipe(recipe)
+        schema_errors = list(islice(iter_schema_errors(recipe), MAX_REPORTED_ERRORS))
         if schema_errors:
             raise ValueError(f"Schema errors: {schema_errors}")
 
@@ -38,7 +42,7 @@ def run_pipeline(
         if normalization_errors:
             raise ValueError(f"Normalization errors: {normalization_errors}")
 
-        rule_errors = validate_steps(recipe.steps)
+        rule_errors = list(islice(iter_rule_errors(recipe.steps), MAX_REPORTED_ERRORS))
         if rule_errors:
             raise ValueError(f"Rule errors: {rule_errors}")
 
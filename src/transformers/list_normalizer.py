@@ -3,16 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import List
 
 from src.utils.lookups_loader import LookupTables
-from src.utils.recipe_schema import Ingredient, Recipe, Step
-
-ALLOWED_MODES = {
-    "描述(Description)",
-    "称重(Weigh)",
-    "自适应烹饪(Adapted Cooking)",
-}
+from src.utils.recipe_schema import Recipe
+from src.validators.rule_validator import VALID_MODES
 
 
 @dataclass(frozen=True)
@@ -20,39 +15,23 @@ class NormalizationError:
     message: str
 
 
-def _validate_membership(value: str, allowed: Iterable[str], field: str) -> List[NormalizationError]:
-    if value not in allowed:
-        return [NormalizationError(f"{field} value '{value}' is not in lookup list")]
-    return []
-
-
-def normalize_ingredients(
-    ingredients: List[Ingredient], lookups: LookupTables
-) -> List[NormalizationError]:
-    errors: List[NormalizationError] = []
-    for ingredient in ingredients:
-        errors.extend(_validate_membership(ingredient.unit, lookups.units, "unit"))
-    return errors
-
-
-def normalize_steps(steps: List[Step], lookups: LookupTables) -> List[NormalizationError]:
-    errors: List[NormalizationError] = []
-    allowed_modes = set(lookups.working_modes) & ALLOWED_MODES
-    for step in steps:
-        errors.extend(_validate_membership(step.mode, allowed_modes, "working_mode"))
-    return errors
-
-
-def normalize_accessories(accessories: List[str], lookups: LookupTables) -> List[NormalizationError]:
-    errors: List[NormalizationError] = []
-    for accessory in accessories:
-        errors.extend(_validate_membership(accessory, lookups.accessories, "accessory"))
-    return errors
+def _not_in_lookup(field: str, value: str) -> NormalizationError:
+    return NormalizationError(f"{field} value '{value}' is not in lookup list")
 
 
 def normalize_recipe(recipe: Recipe, lookups: LookupTables, accessories: List[str]) -> List[NormalizationError]:
+    # Single pass over the recipe; errors keep the ingredients/steps/accessories order.
     errors: List[NormalizationError] = []
-    errors.extend(normalize_ingredients(recipe.ingredients, lookups))
-    errors.extend(normalize_steps(recipe.steps, lookups))
-    errors.extend(normalize_accessories(accessories, lookups))
+    units = lookups.units_set
+    for ingredient in recipe.ingredients:
+        if ingredient.unit not in units:
+            errors.append(_not_in_lookup("unit", ingredient.unit))
+    allowed_modes = lookups.working_modes_set & VALID_MODES
+    for step in recipe.steps:
+        if step.mode not in allowed_modes:
+            errors.append(_not_in_lookup("working_mode", step.mode))
+    allowed_accessories = lookups.accessories_set
+    for accessory in accessories:
+        if accessory not in allowed_accessories:
+            errors.append(_not_in_lookup("accessory", accessory))
     return errors
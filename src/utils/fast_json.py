@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""JSON helpers that use orjson when it is installed and the stdlib otherwise."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_indented(obj: Any) -> bytes:
+    """Serialize ``obj`` as 2-space indented UTF-8 JSON, non-ASCII left unescaped.
+
+    The two backends agree on strings, ints and nested containers, but not on
+    every edge case: orjson writes ``1e16`` where json writes ``1e+16``, turns
+    NaN/Infinity into ``null`` and rejects integers wider than 64 bits.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def dump_indented(obj: Any, path: Path) -> None:
+    """Write ``dumps_indented(obj)`` to ``path``, streaming when orjson is missing."""
+    if orjson is not None:
+        path.write_bytes(dumps_indented(obj))
+        return
+    with path.open("w", encoding="utf-8") as fh:
+        json.dump(obj, fh, ensure_ascii=False, indent=2)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, FrozenSet, Iterable, List, Optional
 
 
 @dataclass(frozen=True)
@@ -15,14 +15,23 @@ class LookupTables:
     working_modes: List[str]
     categories: List[str]
     labels: List[str]
+    # Membership views of the sorted lists, for O(1) lookups during validation.
+    units_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    accessories_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    working_modes_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
 
-
-def _strip_empty(values: Iterable[Optional[str]]) -> List[str]:
-    return [value.strip() for value in values if value and value.strip()]
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "units_set", frozenset(self.units))
+        object.__setattr__(self, "accessories_set", frozenset(self.accessories))
+        object.__setattr__(self, "working_modes_set", frozenset(self.working_modes))
 
 
 def _extract_column(rows: List[Dict[str, Optional[str]]], header: str) -> List[str]:
-    return _strip_empty(row.get(header) for row in rows)
+    return [
+        stripped
+        for row in rows
+        if (value := row.get(header)) and (stripped := value.strip())
+    ]
 
 
 def _unique_sorted(values: Iterable[str]) -> List[str]:
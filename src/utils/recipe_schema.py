@@ -3,13 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 LANGUAGE_ES = "ES"
 RECIPE_TYPE_ROBOT_COOKER = "汤机(Robot Cooker)"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class RecipeMeta:
     recipe_no: int
     language: str
@@ -17,16 +17,26 @@ class RecipeMeta:
     name: str
     servings: int
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> RecipeMeta:
+        return cls(
+            data["recipe_no"], data["language"], data["recipe_type"], data["name"], data["servings"]
+        )
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Ingredient:
     no: int
     qty: float
     unit: str
     name: str
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Ingredient:
+        return cls(data["no"], data["qty"], data["unit"], data["name"])
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Step:
     no: int
     mode: str
@@ -37,31 +47,45 @@ class Step:
     minutes: Optional[int] = None
     seconds: Optional[int] = None
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Step:
+        get = data.get
+        return cls(
+            data["no"],
+            data["mode"],
+            get("description"),
+            get("temperature"),
+            get("speed"),
+            get("direction"),
+            get("minutes"),
+            get("seconds"),
+        )
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Recipe:
     meta: RecipeMeta
     ingredients: List[Ingredient]
     steps: List[Step]
 
 
-def validate_recipe(recipe: Recipe) -> List[str]:
-    errors: List[str] = []
-
+def iter_schema_errors(recipe: Recipe) -> Iterator[str]:
     if recipe.meta.language != LANGUAGE_ES:
-        errors.append(f"language must be {LANGUAGE_ES}")
+        yield f"language must be {LANGUAGE_ES}"
     if recipe.meta.recipe_type != RECIPE_TYPE_ROBOT_COOKER:
-        errors.append(f"recipe_type must be {RECIPE_TYPE_ROBOT_COOKER}")
+        yield f"recipe_type must be {RECIPE_TYPE_ROBOT_COOKER}"
     if recipe.meta.recipe_no <= 0:
-        errors.append("recipe_no must be positive")
+        yield "recipe_no must be positive"
     if recipe.meta.servings <= 0:
-        errors.append("servings must be positive")
+        yield "servings must be positive"
     if not recipe.meta.name.strip():
-        errors.append("name must be non-empty")
+        yield "name must be non-empty"
 
     if not recipe.ingredients:
-        errors.append("ingredients cannot be empty")
+        yield "ingredients cannot be empty"
     if not recipe.steps:
-        errors.append("steps cannot be empty")
+        yield "steps cannot be empty"
+
 
-    return errors
+def validate_recipe(recipe: Recipe) -> List[str]:
+    return list(iter_schema_errors(recipe))
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import FrozenSet, Iterator, List
 
 from src.utils.recipe_schema import Step
 
@@ -11,40 +11,45 @@ MODE_DESCRIPTION = "描述(Description)"
 MODE_WEIGH = "称重(Weigh)"
 MODE_ADAPTED = "自适应烹饪(Adapted Cooking)"
 
+VALID_MODES: FrozenSet[str] = frozenset({MODE_DESCRIPTION, MODE_WEIGH, MODE_ADAPTED})
+# Modes that carry only a description and no machine controls.
+_DESC_MODES: FrozenSet[str] = frozenset({MODE_DESCRIPTION, MODE_WEIGH})
+
 
 @dataclass(frozen=True)
 class RuleError:
     message: str
 
 
-def _has_controls(step: Step) -> bool:
-    return any(
-        value is not None
-        for value in [
-            step.temperature,
-            step.speed,
-            step.direction,
-            step.minutes,
-            step.seconds,
-        ]
-    )
-
-
-def validate_steps(steps: List[Step]) -> List[RuleError]:
-    errors: List[RuleError] = []
+def iter_rule_errors(
+    steps: List[Step], valid_modes: FrozenSet[str] = VALID_MODES
+) -> Iterator[RuleError]:
     for step in steps:
-        if step.mode in {MODE_DESCRIPTION, MODE_WEIGH}:
+        if step.mode not in valid_modes:
+            yield RuleError(f"step {step.no}: unsupported working mode {step.mode}")
+        elif step.mode in _DESC_MODES:
             if not step.description or not step.description.strip():
-                errors.append(RuleError(f"step {step.no}: description required for {step.mode}"))
-            if _has_controls(step):
-                errors.append(RuleError(f"step {step.no}: controls must be empty for {step.mode}"))
+                yield RuleError(f"step {step.no}: description required for {step.mode}")
+            if (
+                step.temperature is not None
+                or step.speed is not None
+                or step.direction is not None
+                or step.minutes is not None
+                or step.seconds is not None
+            ):
+                yield RuleError(f"step {step.no}: controls must be empty for {step.mode}")
         elif step.mode == MODE_ADAPTED:
             if step.description and step.description.strip():
-                errors.append(RuleError(f"step {step.no}: description should be empty for {step.mode}"))
+                yield RuleError(f"step {step.no}: description should be empty for {step.mode}")
             if step.minutes is None and step.seconds is None:
-                errors.append(RuleError(f"step {step.no}: time required for {step.mode}"))
+                yield RuleError(f"step {step.no}: time required for {step.mode}")
             if step.speed is None:
-                errors.append(RuleError(f"step {step.no}: speed required for {step.mode}"))
+                yield RuleError(f"step {step.no}: speed required for {step.mode}")
         else:
-            errors.append(RuleError(f"step {step.no}: unsupported working mode {step.mode}"))
-    return errors
+            yield RuleError(f"step {step.no}: unsupported working mode {step.mode}")
+
+
+def validate_steps(
+    steps: List[Step], valid_modes: FrozenSet[str] = VALID_MODES
+) -> List[RuleError]:
+    return list(iter_rule_errors(steps, valid_modes))